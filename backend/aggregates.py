@@ -0,0 +1,103 @@
+from collections import deque
+from typing import Dict
+from models import STARTING_BALANCE, MarketState, StrategyType, Team
+
+
+class StrategyTotals:
+    """Running totals for the teams following one strategy"""
+
+    def __init__(self):
+        self.teams = 0
+        self.balance = 0.0
+        self.positions = 0
+        self.open_interest = 0.0
+        self.trades = 0
+
+    def add(self, team: Team):
+        self.teams += 1
+        self.balance += team.balance
+        self.positions += len(team.positions)
+        self.open_interest += sum(pos.quantity for pos in team.positions)
+        self.trades += team.trades_count
+
+    def summary(self, price: float) -> dict:
+        equity = self.balance + self.open_interest * price
+        return {
+            "teams": self.teams,
+            "open_interest": self.open_interest,
+            "total_trades": self.trades,
+            "total_equity": equity,
+            "average_pnl": equity / self.teams - STARTING_BALANCE if self.teams else 0.0
+        }
+
+
+class MarketAggregates:
+    """Market-wide statistics maintained incrementally.
+
+    The simulator rebuilds the totals exactly during each tick's strategy
+    pass, which already visits every team. Changes made by routes between
+    ticks are applied incrementally, so reading the current totals never
+    has to walk the teams and float error never outlives a tick.
+    """
+
+    def __init__(self, history_length: int = 1000):
+        self.by_strategy = self.empty_totals()
+        self.history = deque(maxlen=history_length)
+
+    @staticmethod
+    def empty_totals() -> Dict[StrategyType, StrategyTotals]:
+        return {strategy: StrategyTotals() for strategy in StrategyType}
+
+    def add_team(self, team: Team):
+        self.by_strategy[team.strategy].add(team)
+
+    def remove_team(self, team: Team):
+        totals = self.by_strategy[team.strategy]
+        totals.teams -= 1
+        if totals.teams == 0:
+            self.by_strategy[team.strategy] = StrategyTotals()
+            return
+
+        totals.balance -= team.balance
+        totals.positions -= len(team.positions)
+        totals.open_interest -= sum(pos.quantity for pos in team.positions)
+        totals.trades -= team.trades_count
+        if totals.positions == 0:
+            totals.open_interest = 0.0
+
+    def record_cash(self, team: Team, amount: float):
+        self.by_strategy[team.strategy].balance += amount
+
+    def record_position(self, team: Team, positions: int, quantity: float):
+        """Record positions opened (positive) or closed (negative)"""
+        totals = self.by_strategy[team.strategy]
+        totals.positions += positions
+        totals.open_interest = totals.open_interest + quantity if totals.positions else 0.0
+
+    def record_trade(self, team: Team):
+        self.by_strategy[team.strategy].trades += 1
+
+    def summary(self, market_state: MarketState) -> dict:
+        price = market_state.price
+        teams = sum(t.teams for t in self.by_strategy.values())
+        balance = sum(t.balance for t in self.by_strategy.values())
+        open_interest = sum(t.open_interest for t in self.by_strategy.values())
+        equity = balance + open_interest * price
+
+        return {
+            "tick": market_state.tick,
+            "price": price,
+            "total_teams": teams,
+            "open_interest": open_interest,
+            "total_trades": sum(t.trades for t in self.by_strategy.values()),
+            "total_equity": equity,
+            "average_pnl": equity / teams - STARTING_BALANCE if teams else 0.0,
+            "strategies": {
+                strategy.value: totals.summary(price)
+                for strategy, totals in self.by_strategy.items()
+            }
+        }
+
+    def record_tick(self, market_state: MarketState):
+        """Append the current totals to the per-tick time series"""
+        self.history.append(self.summary(market_state))
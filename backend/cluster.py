@@ -0,0 +1,679 @@
+"""Multi-worker deployment: one simulator process, many stateless API workers.
+
+The owner process runs the market simulator and publishes its state into
+shared memory after every tick and every applied command. API workers map
+the segments read-only and serve GET requests from them; any other request
+is forwarded to the owner over a Unix socket and executed there against the
+real app, so all writes happen in one place between ticks.
+
+Run the owner, then the workers:
+
+    python cluster.py
+    SIMULATOR_ROLE=worker uvicorn main:app --workers 4
+
+State is published as a compact derived view rather than the models
+themselves, in two segments:
+
+- ``SIMULATOR_SHM_NAME``: market state and price history, strategy totals,
+  the ranked leaderboard and each team's fixed-size fields. Rewritten on
+  every publish.
+- ``SIMULATOR_SHM_NAME``_history: every team's pnl_history and the per-tick
+  statistics series. Rewritten only when the tick or the set of teams
+  changes, since nothing else touches them.
+
+Each segment starts with a sequence number and the length of each section.
+The sequence is a seqlock: the owner makes it odd while writing and even
+when done, and readers retry briefly whenever it is odd or changed during a
+copy, then keep serving their previous copy. A restarted owner replaces the
+segments and flags the old ones as retired, so workers reattach.
+Sections and socket frames are MessagePack, so nothing a worker reads can
+execute code; the socket lives in a private (0700) runtime directory.
+"""
+import asyncio
+import logging
+import os
+import signal
+import stat
+import struct
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+from collections import deque
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import msgpack
+import numpy as np
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+
+from aggregates import MarketAggregates, StrategyTotals
+from encoding import response_cache
+from models import MarketState, Position, StrategyParams, StrategyType, Team
+
+logger = logging.getLogger(__name__)
+
+
+def default_socket_path() -> str:
+    base = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    return os.path.join(base, f"bbb-simulator-{os.getuid()}", "simulator.sock")
+
+
+SHM_NAME = os.environ.get("SIMULATOR_SHM_NAME", "bbb_market_state")
+SHM_SIZE = int(os.environ.get("SIMULATOR_SHM_SIZE", str(64 * 1024 * 1024)))
+SOCKET_PATH = os.environ.get("SIMULATOR_SOCKET") or default_socket_path()
+PUBLISH_INTERVAL = 0.02
+FORWARD_TIMEOUT = 10.0
+READ_TIMEOUT = 0.005
+
+MAX_SECTIONS = 4
+SEQUENCE = struct.Struct("<Q")
+LENGTHS = struct.Struct(f"<{MAX_SECTIONS}Q")
+RETIRED = struct.Struct("<Q")
+RETIRED_OFFSET = SEQUENCE.size + LENGTHS.size
+DATA_OFFSET = 64
+FRAME = struct.Struct("<I")
+MAX_FRAME = 64 * 1024 * 1024
+
+# Sections of the state and history segments
+MARKET, LEADERBOARD, TEAMS = range(3)
+PNL, STATS_HISTORY = range(2)
+
+READ_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+class PublishError(RuntimeError):
+    """The owner applied a command but could not publish the resulting state"""
+
+
+def ensure_private_dir(path: str, create: bool = False):
+    """Refuse to use a socket directory another user could write to"""
+    if create:
+        os.makedirs(path, mode=0o700, exist_ok=True)
+    st = os.lstat(path)
+    if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid() or st.st_mode & 0o077:
+        raise PermissionError(f"{path} must be a directory owned by this user with mode 0700")
+
+
+class SharedStateWriter:
+    """Owner side of a shared-memory segment"""
+
+    def __init__(self, name: str = SHM_NAME, size: int = SHM_SIZE):
+        try:
+            # Left behind by an owner that did not shut down cleanly
+            stale = shared_memory.SharedMemory(name=name)
+            retire(stale)
+            stale.close()
+            stale.unlink()
+        except FileNotFoundError:
+            pass
+        self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        self.sequence = 0
+        SEQUENCE.pack_into(self.shm.buf, 0, 0)
+        RETIRED.pack_into(self.shm.buf, RETIRED_OFFSET, 0)
+
+    def publish(self, sections: List[bytes]):
+        end = DATA_OFFSET + sum(len(section) for section in sections)
+        if end > self.shm.size:
+            raise PublishError(f"State snapshot ({end} bytes) exceeds SIMULATOR_SHM_SIZE ({self.shm.size})")
+
+        buf = self.shm.buf
+        SEQUENCE.pack_into(buf, 0, self.sequence + 1)
+        offset = DATA_OFFSET
+        for section in sections:
+            buf[offset:offset + len(section)] = section
+            offset += len(section)
+        lengths = [len(section) for section in sections]
+        LENGTHS.pack_into(buf, SEQUENCE.size, *lengths, *[0] * (MAX_SECTIONS - len(lengths)))
+        self.sequence += 2
+        SEQUENCE.pack_into(buf, 0, self.sequence)
+
+    def close(self):
+        retire(self.shm)
+        self.shm.close()
+        self.shm.unlink()
+
+
+def retire(shm: shared_memory.SharedMemory):
+    """Tell workers still mapping a segment that it is being replaced"""
+    if shm.size >= DATA_OFFSET:
+        RETIRED.pack_into(shm.buf, RETIRED_OFFSET, 1)
+
+
+class SharedStateReader:
+    """Worker side of a shared-memory segment"""
+
+    def __init__(self, name: str = SHM_NAME):
+        self.shm = shared_memory.SharedMemory(name=name)
+        # Attaching registers the segment with this process's resource
+        # tracker, which would unlink it when the worker exits
+        resource_tracker.unregister(self.shm._name, "shared_memory")
+
+    def sequence(self) -> int:
+        return SEQUENCE.unpack_from(self.shm.buf, 0)[0]
+
+    def retired(self) -> bool:
+        return RETIRED.unpack_from(self.shm.buf, RETIRED_OFFSET)[0] != 0
+
+    def read(self, timeout: float = READ_TIMEOUT) -> Tuple[int, List[bytes]]:
+        """Copy a consistent set of sections.
+
+        Spins on the caller's thread, so ``timeout`` is kept short; raises
+        TimeoutError if the owner is still writing when it runs out.
+        """
+        buf = self.shm.buf
+        deadline = time.monotonic() + timeout
+        while True:
+            sequence = self.sequence()
+            lengths = LENGTHS.unpack_from(buf, SEQUENCE.size)
+            if sequence and not sequence & 1 and DATA_OFFSET + sum(lengths) <= self.shm.size:
+                sections = []
+                offset = DATA_OFFSET
+                for length in lengths:
+                    sections.append(bytes(buf[offset:offset + length]))
+                    offset += length
+                if self.sequence() == sequence:
+                    return sequence, sections
+
+            if time.monotonic() > deadline:
+                raise TimeoutError("No consistent simulator state in shared memory")
+            time.sleep(0)
+
+    def close(self):
+        self.shm.close()
+
+
+class ReplicaAggregates(MarketAggregates):
+    """Strategy totals from the state segment; history is read on demand"""
+
+    def __init__(self, replica: "SimulatorReplica", totals: Dict[str, list]):
+        self.replica = replica
+        self.by_strategy = {}
+        for strategy in StrategyType:
+            strategy_totals = StrategyTotals()
+            (strategy_totals.teams, strategy_totals.balance, strategy_totals.positions,
+             strategy_totals.open_interest, strategy_totals.trades) = totals[strategy.value]
+            self.by_strategy[strategy] = strategy_totals
+
+    @property
+    def history(self) -> list:
+        return self.replica.history()[1]
+
+
+class SimulatorReplica:
+    """Read-only stand-in for MarketSimulator inside an API worker.
+
+    ``refresh`` is called at the start of every read request and only
+    decodes the small market section; the leaderboard, teams and history
+    sections are decoded when a route first asks for them. Once a segment
+    has been read, a read that times out keeps the previous copy.
+    """
+
+    def __init__(self, name: str = SHM_NAME):
+        self.name = name
+        self.state_reader: Optional[SharedStateReader] = None
+        self.history_reader: Optional[SharedStateReader] = None
+        self.sequence = 0
+        self.history_sequence = 0
+        self.version = 0
+        self.market_state: Optional[MarketState] = None
+        self.price_history: List[float] = []
+        self.aggregates: Optional[ReplicaAggregates] = None
+        self._sections: List[bytes] = []
+        self._leaderboard: Optional[dict] = None
+        self._teams: Optional[Dict[str, Team]] = None
+        self._history: Optional[Tuple[Dict[str, bytes], list]] = None
+
+    def refresh(self) -> bool:
+        """Load the latest published state; raises OSError before the owner first publishes"""
+        if self.state_reader is not None and self.state_reader.retired():
+            self.state_reader.close()
+            self.state_reader = None
+        if self.state_reader is None:
+            self.state_reader = SharedStateReader(self.name)
+            self.sequence = 0
+            # A restarted owner counts versions from zero again
+            response_cache.clear()
+        if self.state_reader.sequence() == self.sequence and self.market_state is not None:
+            return False
+
+        try:
+            self.sequence, self._sections = self.state_reader.read()
+        except TimeoutError:
+            if self.market_state is None:
+                raise
+            return False
+        market = msgpack.unpackb(self._sections[MARKET])
+        self.market_state = MarketState.model_validate(market["market_state"])
+        self.price_history = market["price_history"]
+        self.aggregates = ReplicaAggregates(self, market["totals"])
+        self.version = market["version"]
+        self._leaderboard = None
+        self._teams = None
+        return True
+
+    @property
+    def cache_state(self) -> Tuple[int, int]:
+        return self.market_state.tick, self.version
+
+    def leaderboard(self) -> dict:
+        if self._leaderboard is None:
+            self._leaderboard = msgpack.unpackb(self._sections[LEADERBOARD])
+        return self._leaderboard
+
+    def history(self) -> Tuple[Dict[str, bytes], list]:
+        """Raw pnl_history arrays by team ID, and the per-tick statistics"""
+        if self.history_reader is not None and self.history_reader.retired():
+            self.history_reader.close()
+            self.history_reader = None
+        if self.history_reader is None:
+            self.history_reader = SharedStateReader(f"{self.name}_history")
+            self.history_sequence = 0
+        if self.history_reader.sequence() != self.history_sequence or self._history is None:
+            try:
+                self.history_sequence, sections = self.history_reader.read()
+            except TimeoutError:
+                if self._history is None:
+                    raise
+                return self._history
+            self._history = (msgpack.unpackb(sections[PNL]), msgpack.unpackb(sections[STATS_HISTORY]))
+            self._teams = None
+        return self._history
+
+    @property
+    def teams(self) -> Dict[str, Team]:
+        if self._teams is None:
+            pnl = self.history()[0]
+            teams = {}
+            for team_id, name, balance, strategy, parameters, trades_count, positions in msgpack.unpackb(self._sections[TEAMS]):
+                risk_level, entry_threshold, stop_loss, take_profit = parameters
+                teams[team_id] = Team.model_construct(
+                    id=team_id,
+                    name=name,
+                    balance=balance,
+                    positions=[
+                        Position.model_construct(asset=asset, quantity=quantity, entry_price=entry_price,
+                                                 position_type=position_type)
+                        for asset, quantity, entry_price, position_type in positions
+                    ],
+                    strategy=StrategyType(strategy),
+                    parameters=StrategyParams.model_construct(
+                        risk_level=risk_level, entry_threshold=entry_threshold,
+                        stop_loss=stop_loss, take_profit=take_profit
+                    ),
+                    pnl_history=np.frombuffer(pnl.get(team_id, b""), dtype="<f8").tolist(),
+                    trades_count=trades_count
+                )
+            self._teams = teams
+        return self._teams
+
+
+async def read_frame(reader: asyncio.StreamReader):
+    (length,) = FRAME.unpack(await reader.readexactly(FRAME.size))
+    if length > MAX_FRAME:
+        raise ConnectionError(f"Frame of {length} bytes exceeds the limit")
+    return msgpack.unpackb(await reader.readexactly(length))
+
+
+async def write_frame(writer: asyncio.StreamWriter, message):
+    data = msgpack.packb(message)
+    writer.write(FRAME.pack(len(data)) + data)
+    await writer.drain()
+
+
+async def call_asgi(app, method: str, path: str, query_string: bytes = b"",
+                    headers: Optional[List[Tuple[bytes, bytes]]] = None,
+                    body: bytes = b"") -> Tuple[int, List[Tuple[bytes, bytes]], bytes]:
+    """Run one HTTP request through an ASGI app in-process"""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": query_string,
+        "headers": headers or [],
+        "client": ("127.0.0.1", 0),
+        "server": ("127.0.0.1", 0),
+    }
+    request_sent = False
+    response_complete = asyncio.Event()
+    status = 500
+    response_headers = []
+    chunks = []
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await response_complete.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status, response_headers
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            response_headers = message.get("headers", [])
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                response_complete.set()
+
+    await app(scope, receive, send)
+    return status, response_headers, b"".join(chunks)
+
+
+def encode_pnl(pnl: Dict[str, Sequence[float]]) -> Tuple[Dict[str, Tuple[float, float]], Dict[str, bytes]]:
+    """Sharpe ratio and win rate per team, plus each series as raw float64.
+
+    Same results as simulation.pnl_metrics, vectorised over teams whose
+    histories have the same length (normally all of them).
+    """
+    by_length: Dict[int, List[str]] = {}
+    for team_id, values in pnl.items():
+        by_length.setdefault(len(values), []).append(team_id)
+
+    metrics = {}
+    encoded = {}
+    for length, team_ids in by_length.items():
+        series = np.array([pnl[team_id] for team_id in team_ids], dtype="<f8").reshape(len(team_ids), length)
+        if length > 1:
+            returns = np.diff(series, axis=1)
+            std = returns.std(axis=1)
+            sharpe = np.where(std > 0, returns.mean(axis=1) / np.where(std > 0, std, 1.0) * np.sqrt(252), 0.0)
+            win_rate = np.count_nonzero(returns > 0, axis=1) / (length - 1) * 100
+        else:
+            sharpe = win_rate = np.zeros(len(team_ids))
+
+        for row, team_id in enumerate(team_ids):
+            metrics[team_id] = (float(sharpe[row]), float(win_rate[row]))
+            encoded[team_id] = series[row].tobytes()
+    return metrics, encoded
+
+
+class StatePublisher:
+    """Publishes the owner's state, coalescing bursts of commands.
+
+    ``capture`` copies the plain fields it needs on the event loop; encoding
+    and the shared-memory writes run on a dedicated thread so ticks and
+    commands are not held up by them.
+    """
+
+    def __init__(self, simulator, state_writer: SharedStateWriter, history_writer: SharedStateWriter,
+                 interval: float = PUBLISH_INTERVAL):
+        self.simulator = simulator
+        self.state_writer = state_writer
+        self.history_writer = history_writer
+        self.interval = interval
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="state-publisher")
+        # (tick, roster_version) of the last history segment written, and
+        # the writer thread's copy of every team's pnl_history
+        self.history_key = None
+        self.pnl: Dict[str, deque] = {}
+        self.metrics: Dict[str, Tuple[float, float]] = {}
+        self.pending: List[asyncio.Future] = []
+        self.wakeup = asyncio.Event()
+
+    def capture(self) -> dict:
+        """Copy what the workers need out of the live simulator"""
+        simulator = self.simulator
+        market_state = simulator.market_state
+        snapshot = {
+            "price": market_state.price,
+            "tick": market_state.tick,
+            "market": {
+                "market_state": market_state.model_dump(),
+                "version": simulator.version,
+                "price_history": list(simulator.price_history),
+                "totals": {
+                    strategy.value: [totals.teams, totals.balance, totals.positions,
+                                     totals.open_interest, totals.trades]
+                    for strategy, totals in simulator.aggregates.by_strategy.items()
+                }
+            },
+            "teams": [
+                (team.id, team.name, team.balance, team.strategy.value,
+                 (team.parameters.risk_level, team.parameters.entry_threshold,
+                  team.parameters.stop_loss, team.parameters.take_profit),
+                 team.trades_count,
+                 [(pos.asset, pos.quantity, pos.entry_price, pos.position_type) for pos in team.positions])
+                for team in simulator.teams.values()
+            ],
+            "history_key": (market_state.tick, simulator.roster_version),
+            "history": None
+        }
+
+        # pnl_history and the statistics series only change on a tick or
+        # when teams come and go. After a single tick each team has gained
+        # exactly one value, so only that is copied on the event loop.
+        tick, roster_version = snapshot["history_key"]
+        if snapshot["history_key"] != self.history_key:
+            if self.history_key == (tick - 1, roster_version):
+                pnl = ("append", [(team.id, team.pnl_history[-1], len(team.pnl_history))
+                                  for team in simulator.teams.values()])
+            else:
+                pnl = ("full", {team.id: list(team.pnl_history) for team in simulator.teams.values()})
+            snapshot["history"] = (pnl, list(simulator.aggregates.history))
+        return snapshot
+
+    def write(self, snapshot: dict):
+        """Encode a captured snapshot and publish it; runs off the event loop"""
+        from simulation import leaderboard_payload
+
+        if snapshot["history"] is not None:
+            (kind, pnl), stats_history = snapshot["history"]
+            # Forget the mirror first so a failure below forces a full copy
+            self.history_key = None
+            if kind == "full":
+                self.pnl = {team_id: deque(values) for team_id, values in pnl.items()}
+            else:
+                for team_id, value, length in pnl:
+                    series = self.pnl[team_id]
+                    series.append(value)
+                    while len(series) > length:
+                        series.popleft()
+
+            self.metrics, encoded = encode_pnl(self.pnl)
+            self.history_writer.publish([msgpack.packb(encoded), msgpack.packb(stats_history)])
+            self.history_key = snapshot["history_key"]
+
+        rows = [
+            (team_id, name, balance, sum(pos[1] for pos in positions), trades_count, strategy,
+             *self.metrics.get(team_id, (0.0, 0.0)))
+            for team_id, name, balance, strategy, _, trades_count, positions in snapshot["teams"]
+        ]
+        self.state_writer.publish([
+            msgpack.packb(snapshot["market"]),
+            msgpack.packb(leaderboard_payload(rows, snapshot["price"], snapshot["tick"])),
+            msgpack.packb(snapshot["teams"])
+        ])
+
+    def publish_now(self):
+        self.write(self.capture())
+
+    def request(self) -> asyncio.Future:
+        """Schedule a publish; the future resolves once it is visible to workers"""
+        future = asyncio.get_running_loop().create_future()
+        self.pending.append(future)
+        self.wakeup.set()
+        return future
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await self.wakeup.wait()
+            await asyncio.sleep(self.interval)
+            self.wakeup.clear()
+            waiting, self.pending = self.pending, []
+
+            error = None
+            try:
+                await loop.run_in_executor(self.executor, self.write, self.capture())
+            except Exception as exc:
+                logger.exception("Publishing simulator state failed")
+                error = exc if isinstance(exc, PublishError) else PublishError(str(exc))
+
+            for future in waiting:
+                if future.done():
+                    continue
+                if error is None:
+                    future.set_result(None)
+                else:
+                    future.set_exception(error)
+
+
+def command_handler(app, publisher: StatePublisher, connections: Optional[set] = None):
+    """Serve forwarded requests from one worker connection.
+
+    Handler tasks are added to ``connections`` so shutdown can cancel them.
+    """
+    connections = set() if connections is None else connections
+
+    async def handle(reader: asyncio.StreamReader, stream: asyncio.StreamWriter):
+        task = asyncio.current_task()
+        connections.add(task)
+        try:
+            while True:
+                command = await read_frame(reader)
+                status, headers, body = await call_asgi(
+                    app, command["method"], command["path"], command["query_string"],
+                    [tuple(header) for header in command["headers"]], command["body"]
+                )
+                try:
+                    await publisher.request()
+                    reply = {"status": status, "headers": headers, "body": body}
+                except PublishError as exc:
+                    reply = {"error": str(exc)}
+                await write_frame(stream, reply)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except asyncio.CancelledError:
+            # asyncio logs server handler tasks that end cancelled
+            pass
+        finally:
+            connections.discard(task)
+            stream.close()
+
+    return handle
+
+
+async def run_owner(socket_path: str = SOCKET_PATH, shm_name: str = SHM_NAME, shm_size: int = SHM_SIZE):
+    """Run the simulator, publish its state and execute commands from workers"""
+    from main import app
+    from simulation import simulator
+
+    ensure_private_dir(os.path.dirname(socket_path), create=True)
+    state_writer = SharedStateWriter(shm_name, shm_size)
+    history_writer = SharedStateWriter(f"{shm_name}_history", shm_size)
+    publisher = StatePublisher(simulator, state_writer, history_writer)
+    publisher.publish_now()
+
+    async def tick_loop():
+        while True:
+            await asyncio.sleep(simulator.tick_interval)
+            simulator.step()
+            publisher.request()
+
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    connections = set()
+    server = await asyncio.start_unix_server(command_handler(app, publisher, connections), path=socket_path)
+
+    loop = asyncio.get_running_loop()
+    stopped = asyncio.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stopped.set)
+
+    tasks = [asyncio.create_task(tick_loop()), asyncio.create_task(publisher.run())]
+    try:
+        await stopped.wait()
+    finally:
+        for task in tasks:
+            task.cancel()
+        server.close()
+        # Idle worker connections would otherwise keep wait_closed() waiting
+        for task in connections:
+            task.cancel()
+        await asyncio.gather(*connections, return_exceptions=True)
+        await server.wait_closed()
+        publisher.executor.shutdown()
+        state_writer.close()
+        history_writer.close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+
+class CommandClient:
+    """Worker side of the command socket, with a small connection pool"""
+
+    def __init__(self, socket_path: str = SOCKET_PATH, timeout: float = FORWARD_TIMEOUT):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self.idle: List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+
+    async def forward(self, method: str, path: str, query_string: bytes,
+                      headers: List[Tuple[bytes, bytes]], body: bytes) -> dict:
+        command = {"method": method, "path": path, "query_string": query_string,
+                   "headers": headers, "body": body}
+        return await asyncio.wait_for(self._forward(command), self.timeout)
+
+    async def _forward(self, command: dict) -> dict:
+        if self.idle:
+            reader, writer = self.idle.pop()
+        else:
+            ensure_private_dir(os.path.dirname(self.socket_path))
+            reader, writer = await asyncio.open_unix_connection(self.socket_path)
+
+        try:
+            await write_frame(writer, command)
+            reply = await read_frame(reader)
+        except BaseException:
+            writer.close()
+            raise
+
+        self.idle.append((reader, writer))
+        return reply
+
+
+def worker_middleware(replica: SimulatorReplica, client: Optional[CommandClient] = None):
+    """HTTP middleware serving reads from the replica and forwarding writes"""
+    client = client or CommandClient()
+
+    async def middleware(request: Request, call_next):
+        if request.method in READ_METHODS:
+            # Routes read the history segment lazily, so it can fail in call_next too
+            try:
+                replica.refresh()
+                return await call_next(request)
+            except OSError:
+                return JSONResponse(status_code=503, content={"detail": "Simulator not initialized"})
+
+        body = await request.body()
+        try:
+            reply = await client.forward(
+                request.method, request.url.path, request.scope["query_string"],
+                request.scope["headers"], body
+            )
+        except asyncio.TimeoutError:
+            return JSONResponse(status_code=504, content={"detail": "Simulator did not respond"})
+        except (OSError, asyncio.IncompleteReadError):
+            return JSONResponse(status_code=503, content={"detail": "Simulator not reachable"})
+
+        if "error" in reply:
+            return JSONResponse(status_code=503, content={"detail": f"Simulator state not published: {reply['error']}"})
+
+        response = Response(content=reply["body"], status_code=reply["status"])
+        response.raw_headers = [tuple(header) for header in reply["headers"]]
+        return response
+
+    return middleware
+
+
+if __name__ == "__main__":
+    os.environ["SIMULATOR_ROLE"] = "owner"
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    asyncio.run(run_owner())
@@ -0,0 +1,203 @@
+"""Content negotiation, compression and per-tick caching for API payloads.
+
+Routes pass a payload builder and the encoders they support and let
+``negotiated_response`` pick the format from the ``Accept`` header, compress
+it according to ``Accept-Encoding`` and cache the encoded body until the
+simulator's tick or state version changes.
+
+MessagePack, Arrow and Brotli support are only offered when ``msgpack``,
+``pyarrow`` and ``brotli`` are importable.
+"""
+import gzip
+import json
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from fastapi import HTTPException, Request, Response
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+JSON = "application/json"
+FLOAT64 = "application/octet-stream"
+ARROW = "application/vnd.apache.arrow.stream"
+MSGPACK = "application/msgpack"
+
+COMPRESSION_THRESHOLD = 1024
+
+
+def encode_json(payload) -> bytes:
+    # Matches the output of FastAPI's default JSONResponse
+    return json.dumps(payload, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def encode_msgpack(payload) -> bytes:
+    return msgpack.packb(payload)
+
+
+def encode_float64(values) -> bytes:
+    """Raw little-endian float64 array"""
+    return np.asarray(values, dtype="<f8").tobytes()
+
+
+def encode_arrow(columns: Dict[str, list]) -> bytes:
+    """Arrow IPC stream holding a single float64 record batch"""
+    table = pa.table({name: pa.array(values, type=pa.float64()) for name, values in columns.items()})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def series_encoders(series_key: str) -> Dict[str, Callable[[dict], bytes]]:
+    """Encoders for a payload whose main content is a list of floats"""
+    encoders = {
+        JSON: encode_json,
+        FLOAT64: lambda payload: encode_float64(payload[series_key]),
+    }
+    if pa is not None:
+        encoders[ARROW] = lambda payload: encode_arrow({series_key: payload[series_key]})
+    if msgpack is not None:
+        encoders[MSGPACK] = encode_msgpack
+    return encoders
+
+
+def record_encoders() -> Dict[str, Callable[[dict], bytes]]:
+    """Encoders for a payload made of nested records"""
+    encoders = {JSON: encode_json}
+    if msgpack is not None:
+        encoders[MSGPACK] = encode_msgpack
+    return encoders
+
+
+def _parse_header(value: str) -> List[Tuple[str, float]]:
+    """Split an Accept-style header into (token, q) pairs"""
+    entries = []
+    for part in value.split(","):
+        token, *params = [p.strip() for p in part.split(";")]
+        if not token:
+            continue
+        q = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        entries.append((token.lower(), q))
+    return entries
+
+
+def negotiate(request: Request, offered: List[str]) -> str:
+    """Pick the offered media type best matching the Accept header"""
+    accept = request.headers.get("accept")
+    if not accept:
+        return offered[0]
+
+    ranges = _parse_header(accept)
+    best = None
+    for position, media_type in enumerate(offered):
+        main_type = media_type.split("/")[0]
+        match = None
+        for media_range, q in ranges:
+            if media_range == media_type:
+                specificity = 2
+            elif media_range == f"{main_type}/*":
+                specificity = 1
+            elif media_range == "*/*":
+                specificity = 0
+            else:
+                continue
+            if match is None or specificity > match[1]:
+                match = (q, specificity)
+        if match is None or match[0] <= 0:
+            continue
+        rank = (match[0], match[1], -position)
+        if best is None or rank > best[0]:
+            best = (rank, media_type)
+
+    if best is None:
+        raise HTTPException(status_code=406, detail=f"Supported media types: {', '.join(offered)}")
+    return best[1]
+
+
+def choose_content_encoding(request: Request) -> Optional[str]:
+    """Prefer brotli, then gzip, if the client accepts them"""
+    accepted = {token: q for token, q in _parse_header(request.headers.get("accept-encoding", ""))}
+    if brotli is not None and accepted.get("br", 0) > 0:
+        return "br"
+    if accepted.get("gzip", 0) > 0:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, content_encoding: str) -> bytes:
+    if content_encoding == "br":
+        return brotli.compress(body, quality=4)
+    return gzip.compress(body, compresslevel=5)
+
+
+class ResponseCache:
+    """Encoded response bodies, valid until the simulator state changes"""
+
+    def __init__(self):
+        self.state = None
+        self.entries: Dict[tuple, Tuple[bytes, Optional[str]]] = {}
+
+    def get(self, key: tuple, state: tuple) -> Optional[Tuple[bytes, Optional[str]]]:
+        if state != self.state:
+            self.state = state
+            self.entries.clear()
+            return None
+        return self.entries.get(key)
+
+    def put(self, key: tuple, value: Tuple[bytes, Optional[str]]):
+        self.entries[key] = value
+
+    def clear(self):
+        """Drop every cached body, whatever the state"""
+        self.entries.clear()
+
+
+response_cache = ResponseCache()
+
+
+def negotiated_response(request: Request, cache_key: tuple, state: tuple,
+                        build_payload: Callable[[], dict],
+                        encoders: Dict[str, Callable[[dict], bytes]]) -> Response:
+    """Encode a payload in the negotiated format, cached while ``state`` is unchanged.
+
+    Routes pass ``simulator.cache_state``. ``build_payload`` is only called
+    on a cache miss.
+    """
+    media_type = negotiate(request, list(encoders))
+    content_encoding = choose_content_encoding(request)
+    key = cache_key + (media_type, content_encoding)
+
+    cached = response_cache.get(key, state)
+    if cached is None:
+        body = encoders[media_type](build_payload())
+        applied_encoding = None
+        if content_encoding and len(body) >= COMPRESSION_THRESHOLD:
+            body = compress(body, content_encoding)
+            applied_encoding = content_encoding
+        cached = (body, applied_encoding)
+        response_cache.put(key, cached)
+
+    body, applied_encoding = cached
+    headers = {"Vary": "Accept, Accept-Encoding"}
+    if applied_encoding:
+        headers["Content-Encoding"] = applied_encoding
+    return Response(content=body, media_type=media_type, headers=headers)
@@ -0,0 +1,375 @@
+"""Load generator replaying the frontend's polling mix plus trading bots.
+
+Each virtual client keeps one page open, either the Dashboard or the
+Leaderboard, and polls like its components do (see frontend/src/pages, the
+components they mount and services/api.ts): every component fetches once on
+mount and then on its setInterval. Each bot owns a team and alternates buys
+and closes through /api/trade/execute. Paths are the backend routes the
+frontend calls resolve to.
+
+The simulator also runs each bot team's strategy and can open or close its
+positions between the bot's trades. Bot teams use the hedger with its widest
+stop-loss and take-profit so it practically never closes them, and a bot
+whose close finds nothing left to close resyncs instead of repeating the
+rejected request.
+
+    python loadtest.py --clients 2000 --bots 50 --duration 60
+    python loadtest.py --clients 2000 --leaderboard-share 0.5
+    python loadtest.py --url http://127.0.0.1:8000 --clients 5000
+
+Without --url the app runs in-process, sharing one event loop with the load
+generator, so absolute latencies include client overhead; use it to compare
+changes, and a local uvicorn to measure capacity.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import numpy as np
+
+# (name, method, path, interval in seconds), one entry per polling component
+PAGES = {
+    "dashboard": [
+        ("market_tick", "GET", "/api/market/tick", 2.0),        # PriceChart
+        ("news", "GET", "/api/market/events", 10.0),            # NewsFeed
+        ("sentiment", "GET", "/api/market/events", 10.0),       # MarketSentiment
+        ("event_banner", "GET", "/api/market/events", 15.0),    # EventBanner
+    ],
+    "leaderboard": [
+        ("leaderboard", "GET", "/api/leaderboard/", 10.0),      # Leaderboard
+    ],
+}
+# Fetched once when any page mounts
+MOUNT_REQUESTS = [
+    ("teams", "GET", "/api/teams/"),                            # Navbar
+]
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS"}
+# The hedger only closes on these moves, far beyond a bot's holding period;
+# the positions it opens itself are closed by the bot's next close
+BOT_STRATEGY = "hedger"
+BOT_PARAMETERS = {"stop_loss": 20.0, "take_profit": 50.0}
+REQUEST_TIMEOUT = 10.0
+
+
+class ASGITransport:
+    """Sends requests straight into the app in this process"""
+
+    def __init__(self, app):
+        self.app = app
+
+    def connection(self):
+        return self
+
+    async def request(self, method: str, path: str, body: Optional[bytes] = None) -> Tuple[int, bytes]:
+        from cluster import call_asgi
+
+        path, _, query = path.partition("?")
+        headers = [(b"host", b"loadtest")]
+        if body is not None:
+            headers.append((b"content-type", b"application/json"))
+        status, _, content = await call_asgi(self.app, method, path, query.encode(), headers, body or b"")
+        return status, content
+
+    async def close(self):
+        pass
+
+
+class HTTPConnection:
+    """Minimal keep-alive HTTP/1.1 client, one per virtual client"""
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+
+    async def request(self, method: str, path: str, body: Optional[bytes] = None) -> Tuple[int, bytes]:
+        if self.reader is not None and self.reader.at_eof():
+            # The server already closed this idle keep-alive connection
+            await self.close()
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+            return await self._send(method, path, body)
+
+        try:
+            return await self._send(method, path, body)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            # The server may have dropped the connection after we wrote the
+            # request; like browsers, only retry when repeating it is harmless
+            if method not in IDEMPOTENT_METHODS:
+                raise
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+            return await self._send(method, path, body)
+
+    async def _send(self, method: str, path: str, body: Optional[bytes]) -> Tuple[int, bytes]:
+
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {self.host}:{self.port}", "Accept: application/json"]
+        if body is not None:
+            lines += ["Content-Type: application/json", f"Content-Length: {len(body)}"]
+        self.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode() + (body or b""))
+
+        try:
+            await self.writer.drain()
+            status_line = await self.reader.readline()
+            if not status_line:
+                raise ConnectionError("Server closed the connection")
+            status = int(status_line.split()[1])
+
+            headers = {}
+            while True:
+                line = await self.reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+            if headers.get("transfer-encoding", "").lower() == "chunked":
+                chunks = []
+                while True:
+                    size = int((await self.reader.readline()).split(b";")[0], 16)
+                    chunk = await self.reader.readexactly(size + 2)
+                    if size == 0:
+                        break
+                    chunks.append(chunk[:-2])
+                content = b"".join(chunks)
+            else:
+                content = await self.reader.readexactly(int(headers.get("content-length", 0)))
+
+            if headers.get("connection", "").lower() == "close":
+                await self.close()
+            return status, content
+        except BaseException:
+            await self.close()
+            raise
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.reader = self.writer = None
+
+
+class HTTPTransport:
+    def __init__(self, url: str):
+        parts = urlsplit(url)
+        self.host = parts.hostname or "127.0.0.1"
+        self.port = parts.port or 80
+
+    def connection(self) -> HTTPConnection:
+        return HTTPConnection(self.host, self.port)
+
+
+class LoadStats:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Counter] = defaultdict(Counter)
+        self.tick_timestamps: Dict[int, float] = {}
+
+    def record(self, name: str, latency: float, status):
+        self.latencies[name].append(latency)
+        self.statuses[name][status] += 1
+
+    def record_tick(self, content: bytes):
+        try:
+            data = json.loads(content)
+            self.tick_timestamps.setdefault(data["tick"], data["timestamp"])
+        except (ValueError, KeyError, TypeError):
+            pass
+
+    def tick_drift(self, tick_interval: float) -> Optional[dict]:
+        """Lateness of each tick against the simulator's schedule, from its own timestamps"""
+        ticks = sorted(self.tick_timestamps)
+        drifts = [
+            self.tick_timestamps[b] - self.tick_timestamps[a] - tick_interval * (b - a)
+            for a, b in zip(ticks, ticks[1:])
+        ]
+        if not drifts:
+            return None
+        drifts = np.array(drifts) * 1000
+        return {
+            "ticks_observed": len(ticks),
+            "mean_ms": float(np.mean(drifts)),
+            "p95_ms": float(np.percentile(drifts, 95)),
+            "max_ms": float(np.max(drifts))
+        }
+
+    def summary(self, duration: float, tick_interval: float) -> dict:
+        endpoints = {}
+        for name, latencies in sorted(self.latencies.items()):
+            values = np.array(latencies) * 1000
+            statuses = self.statuses[name]
+            count = sum(statuses.values())
+            errors = sum(n for status, n in statuses.items() if status == "error" or status >= 500)
+            rejected = sum(n for status, n in statuses.items() if status != "error" and 400 <= status < 500)
+            endpoints[name] = {
+                "requests": count,
+                "rps": count / duration,
+                "p50_ms": float(np.percentile(values, 50)),
+                "p90_ms": float(np.percentile(values, 90)),
+                "p99_ms": float(np.percentile(values, 99)),
+                "max_ms": float(np.max(values)),
+                "error_rate": errors / count,
+                "rejected_rate": rejected / count,
+                "statuses": {str(status): n for status, n in statuses.items()}
+            }
+        return {
+            "duration_s": duration,
+            "endpoints": endpoints,
+            "tick_drift": self.tick_drift(tick_interval)
+        }
+
+
+async def timed_request(stats: LoadStats, connection, name: str, method: str, path: str,
+                        body: Optional[bytes] = None) -> Tuple[Optional[int], bytes]:
+    """Send and record one request; the status is None if it failed in transport"""
+    started = time.perf_counter()
+    try:
+        status, content = await asyncio.wait_for(connection.request(method, path, body), REQUEST_TIMEOUT)
+    except (OSError, ValueError, IndexError, asyncio.TimeoutError, asyncio.IncompleteReadError):
+        stats.record(name, time.perf_counter() - started, "error")
+        return None, b""
+    stats.record(name, time.perf_counter() - started, status)
+    return status, content
+
+
+async def poll(stats: LoadStats, connection, lock: asyncio.Lock, name: str, method: str, path: str,
+               interval: float, mounted: float, deadline: float):
+    """Fire at mount and then on a fixed schedule, like fetchX(); setInterval(fetchX, interval)"""
+    next_run = mounted
+    while next_run < deadline:
+        await asyncio.sleep(max(0.0, next_run - time.monotonic()))
+        async with lock:
+            status, content = await timed_request(stats, connection, name, method, path)
+        if name == "market_tick" and status == 200:
+            stats.record_tick(content)
+        next_run += interval
+
+
+async def mount_request(stats: LoadStats, connection, lock: asyncio.Lock, name: str, method: str, path: str):
+    async with lock:
+        await timed_request(stats, connection, name, method, path)
+
+
+async def virtual_client(stats: LoadStats, transport, page: str, deadline: float, ramp: float):
+    await asyncio.sleep(random.uniform(0, ramp))
+    connection = transport.connection()
+    # A browser tab spreads requests over a few sockets; one keep-alive
+    # connection per client keeps the server-side connection count realistic
+    lock = asyncio.Lock()
+    mounted = time.monotonic()
+    await asyncio.gather(
+        *(mount_request(stats, connection, lock, name, method, path) for name, method, path in MOUNT_REQUESTS),
+        *(poll(stats, connection, lock, name, method, path, interval, mounted, deadline)
+          for name, method, path, interval in PAGES[page])
+    )
+    await connection.close()
+
+
+async def trading_bot(stats: LoadStats, transport, team_id: str, interval: float, quantity: float, deadline: float):
+    connection = transport.connection()
+    holding = False
+    await asyncio.sleep(random.uniform(0, interval))
+    while time.monotonic() < deadline:
+        action = "close" if holding else "buy"
+        body = json.dumps({"team_id": team_id, "action": action, "quantity": quantity}).encode()
+        status, _ = await timed_request(stats, connection, f"trade_{action}", "POST", "/api/trade/execute", body)
+        if status == 200:
+            holding = not holding
+        elif status == 400 and action == "close":
+            # The simulator's strategy pass already closed the position
+            holding = False
+        await asyncio.sleep(min(random.expovariate(1.0 / interval), max(0.0, deadline - time.monotonic())))
+    await connection.close()
+
+
+async def run_load(args) -> dict:
+    simulator_task = None
+    if args.url:
+        transport = HTTPTransport(args.url)
+        tick_interval = args.tick_interval
+    else:
+        from main import app
+        from simulation import simulator
+
+        transport = ASGITransport(app)
+        tick_interval = simulator.tick_interval
+        simulator_task = asyncio.create_task(simulator.run())
+
+    stats = LoadStats()
+    admin = transport.connection()
+    team_ids = [f"loadtest-bot-{i}" for i in range(args.bots)]
+    if team_ids:
+        teams = [
+            {"id": team_id, "name": team_id, "strategy": BOT_STRATEGY, "parameters": BOT_PARAMETERS}
+            for team_id in team_ids
+        ]
+        await timed_request(stats, admin, "bulk_create", "POST", "/api/teams/bulk/create", json.dumps(teams).encode())
+
+    started = time.monotonic()
+    deadline = started + args.duration
+    ramp = min(args.ramp, args.duration)
+    leaderboard_clients = round(args.clients * args.leaderboard_share)
+    pages = ["leaderboard"] * leaderboard_clients + ["dashboard"] * (args.clients - leaderboard_clients)
+    tasks = [virtual_client(stats, transport, page, deadline, ramp) for page in pages]
+    tasks += [trading_bot(stats, transport, team_id, args.bot_interval, args.quantity, deadline) for team_id in team_ids]
+    await asyncio.gather(*tasks)
+    duration = time.monotonic() - started
+
+    if team_ids:
+        await timed_request(stats, admin, "bulk_delete", "POST", "/api/teams/bulk/delete", json.dumps(team_ids).encode())
+    await admin.close()
+
+    if simulator_task:
+        simulator_task.cancel()
+        try:
+            await simulator_task
+        except asyncio.CancelledError:
+            pass
+
+    return stats.summary(duration, tick_interval)
+
+
+def print_report(report: dict):
+    print(f"{'endpoint':<16}{'reqs':>9}{'rps':>9}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}{'max ms':>9}{'err %':>8}{'4xx %':>8}")
+    for name, row in report["endpoints"].items():
+        print(f"{name:<16}{row['requests']:>9}{row['rps']:>9.1f}{row['p50_ms']:>9.1f}{row['p90_ms']:>9.1f}"
+              f"{row['p99_ms']:>9.1f}{row['max_ms']:>9.1f}{row['error_rate'] * 100:>8.2f}{row['rejected_rate'] * 100:>8.2f}")
+
+    drift = report["tick_drift"]
+    if drift:
+        print(f"\ntick drift over {drift['ticks_observed']} ticks: mean {drift['mean_ms']:.1f} ms, "
+              f"p95 {drift['p95_ms']:.1f} ms, max {drift['max_ms']:.1f} ms")
+    else:
+        print("\ntick drift: not enough ticks observed")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Replay the frontend polling mix and trading bots against the API")
+    parser.add_argument("--url", help="Base URL of a running server; runs the app in-process when omitted")
+    parser.add_argument("--clients", type=int, default=1000, help="Number of virtual clients, split across pages")
+    parser.add_argument("--leaderboard-share", type=float, default=0.2,
+                        help="Fraction of clients on the Leaderboard page; the rest are on the Dashboard")
+    parser.add_argument("--bots", type=int, default=20, help="Number of trading bots, each with its own team")
+    parser.add_argument("--bot-interval", type=float, default=1.0, help="Mean seconds between a bot's trades")
+    parser.add_argument("--quantity", type=float, default=1.0, help="Quantity per bot buy order")
+    parser.add_argument("--duration", type=float, default=60.0, help="Seconds to generate load")
+    parser.add_argument("--ramp", type=float, default=10.0, help="Seconds over which clients connect")
+    parser.add_argument("--tick-interval", type=float, default=2.0, help="Server tick interval, for drift with --url")
+    parser.add_argument("--json", dest="json_path", help="Also write the report to this file")
+    args = parser.parse_args()
+    if not 0.0 <= args.leaderboard_share <= 1.0:
+        parser.error("--leaderboard-share must be between 0 and 1")
+    return args
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    report = asyncio.run(run_load(args))
+    print_report(report)
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(report, f, indent=2)
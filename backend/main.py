@@ -3,10 +3,15 @@ from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 import asyncio
 from routes import market, teams, trading, leaderboard
-from simulation import simulator
+from simulation import simulator, SIMULATOR_ROLE
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    # API workers serve a replica; the owner process runs the simulator
+    if SIMULATOR_ROLE == "worker":
+        yield
+        return
+
     # Startup: Start the market simulator
     task = asyncio.create_task(simulator.run())
     yield
@@ -28,6 +33,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Serve reads from shared memory and forward writes to the owner process
+if SIMULATOR_ROLE == "worker":
+    from cluster import worker_middleware
+
+    app.middleware("http")(worker_middleware(simulator))
+
 # Include routers
 app.include_router(market.router, prefix="/api/market", tags=["market"])
 app.include_router(teams.router, prefix="/api/teams", tags=["teams"])
@@ -2,6 +2,9 @@ from pydantic import BaseModel, Field
 from typing import List, Dict, Optional
 from enum import Enum
 
+# Cash every team starts with; P&L is measured against it
+STARTING_BALANCE = 100000.0
+
 class StrategyType(str, Enum):
     MOMENTUM = "momentum"
     MEAN_REVERSION = "mean_reversion"
@@ -23,7 +26,7 @@ class StrategyParams(BaseModel):
 class Team(BaseModel):
     id: str
     name: str
-    balance: float = 100000.0
+    balance: float = STARTING_BALANCE
     positions: List[Position] = []
     strategy: StrategyType = StrategyType.MOMENTUM
     parameters: StrategyParams = StrategyParams()
@@ -45,6 +48,11 @@ class MarketState(BaseModel):
     tick: int = 0
     timestamp: float = 0.0
 
+class StrategyUpdate(BaseModel):
+    team_id: str
+    strategy: StrategyType
+    parameters: StrategyParams = StrategyParams()
+
 class TradeRequest(BaseModel):
     team_id: str
     action: str  # buy, sell, close
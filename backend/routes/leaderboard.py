@@ -1,87 +1,48 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from simulation import simulator
-import numpy as np
+from encoding import negotiated_response, record_encoders
 
 router = APIRouter()
 
 
 @router.get("/")
-async def get_leaderboard():
-    """Get current leaderboard"""
+async def get_leaderboard(request: Request):
+    """Get current leaderboard as JSON or MessagePack"""
     if not simulator:
         raise HTTPException(status_code=503, detail="Simulator not initialized")
 
-    entries = []
+    return negotiated_response(request, ("leaderboard",), simulator.cache_state,
+                               simulator.leaderboard, record_encoders())
 
-    for team in simulator.teams.values():
-        position_value = sum(
-            pos.quantity * simulator.market_state.price
-            for pos in team.positions
-        )
-        total_value = team.balance + position_value
-        total_pnl = total_value - 100000.0
 
-        sharpe_ratio = 0.0
-        if len(team.pnl_history) > 1:
-            returns = np.diff(team.pnl_history)
-            if np.std(returns) > 0:
-                sharpe_ratio = np.mean(returns) / np.std(returns) * np.sqrt(252)
-
-        win_rate = 0.0
-        if len(team.pnl_history) > 1:
-            positive_returns = sum(1 for r in np.diff(team.pnl_history) if r > 0)
-            win_rate = (positive_returns / len(np.diff(team.pnl_history))) * 100
-
-        entries.append({
-            "team_id": team.id,
-            "team_name": team.name,
-            "balance": team.balance,
-            "total_value": total_value,
-            "total_pnl": total_pnl,
-            "sharpe_ratio": sharpe_ratio,
-            "trades_count": team.trades_count,
-            "win_rate": win_rate,
-            "strategy": team.strategy.value
-        })
-
-    entries.sort(key=lambda x: x["total_value"], reverse=True)
+@router.get("/stats")
+async def get_market_stats():
+    """Get overall market statistics from the simulator's running totals"""
+    if not simulator:
+        raise HTTPException(status_code=503, detail="Simulator not initialized")
 
-    for i, entry in enumerate(entries):
-        entry["rank"] = i + 1
+    summary = simulator.aggregates.summary(simulator.market_state)
 
     return {
-        "leaderboard": entries,
-        "total_teams": len(entries),
-        "current_tick": simulator.market_state.tick
+        "total_teams": summary["total_teams"],
+        "total_volume": summary["open_interest"],
+        "total_trades": summary["total_trades"],
+        "total_equity": summary["total_equity"],
+        "average_pnl": summary["average_pnl"],
+        "current_price": simulator.market_state.price,
+        "market_tick": simulator.market_state.tick,
+        "strategies": summary["strategies"]
     }
 
 
-@router.get("/stats")
-async def get_market_stats():
-    """Get overall market statistics"""
+@router.get("/stats/history")
+async def get_market_stats_history(limit: int = 100):
+    """Get per-tick aggregate statistics for charting"""
     if not simulator:
         raise HTTPException(status_code=503, detail="Simulator not initialized")
 
-    total_volume = sum(
-        sum(pos.quantity for pos in team.positions)
-        for team in simulator.teams.values()
-    )
-
-    total_trades = sum(team.trades_count for team in simulator.teams.values())
-
-    avg_pnl = 0
-    if simulator.teams:
-        total_values = [
-            team.balance + sum(pos.quantity * simulator.market_state.price for pos in team.positions)
-            for team in simulator.teams.values()
-        ]
-        avg_pnl = np.mean([v - 100000 for v in total_values])
-
+    history = list(simulator.aggregates.history)[-limit:]
     return {
-        "total_teams": len(simulator.teams),
-        "total_volume": total_volume,
-        "total_trades": total_trades,
-        "average_pnl": avg_pnl,
-        "current_price": simulator.market_state.price,
-        "market_tick": simulator.market_state.tick
+        "history": history,
+        "length": len(history)
     }
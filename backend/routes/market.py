@@ -1,5 +1,6 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from simulation import simulator
+from encoding import negotiated_response, series_encoders
 
 router = APIRouter()
 
@@ -20,16 +21,20 @@ async def get_market_tick():
 
 
 @router.get("/history")
-async def get_price_history(limit: int = 100):
-    """Get historical price data"""
+async def get_price_history(request: Request, limit: int = 100):
+    """Get historical price data as JSON, raw float64, Arrow or MessagePack"""
     if not simulator:
         raise HTTPException(status_code=503, detail="Simulator not initialized")
 
-    history = simulator.price_history[-limit:]
-    return {
-        "prices": history,
-        "length": len(history)
-    }
+    def build_payload():
+        history = simulator.price_history[-limit:]
+        return {
+            "prices": history,
+            "length": len(history)
+        }
+
+    return negotiated_response(request, ("history", limit), simulator.cache_state,
+                               build_payload, series_encoders("prices"))
 
 
 @router.get("/events")
@@ -44,73 +49,3 @@ async def get_active_events():
             "event": simulator.market_state.active_event.dict()
         }
     return {"active": False, "event": None}
-
-
-from fastapi import APIRouter, HTTPException
-from models import Team, StrategyType, StrategyParams
-from simulation import simulator
-
-router = APIRouter()
-
-
-@router.post("/create")
-async def create_team(team: Team):
-    """Create a new team"""
-    if not simulator:
-        raise HTTPException(status_code=503, detail="Simulator not initialized")
-
-    if team.id in simulator.teams:
-        raise HTTPException(status_code=400, detail="Team ID already exists")
-
-    simulator.teams[team.id] = team
-    return {"message": "Team created successfully", "team": team}
-
-
-@router.get("/{team_id}")
-async def get_team(team_id: str):
-    """Get team information"""
-    if not simulator:
-        raise HTTPException(status_code=503, detail="Simulator not initialized")
-
-    if team_id not in simulator.teams:
-        raise HTTPException(status_code=404, detail="Team not found")
-
-    return simulator.teams[team_id]
-
-
-@router.get("/")
-async def get_all_teams():
-    """Get all teams"""
-    if not simulator:
-        raise HTTPException(status_code=503, detail="Simulator not initialized")
-
-    return list(simulator.teams.values())
-
-
-@router.put("/{team_id}/strategy")
-async def update_strategy(team_id: str, strategy: StrategyType, parameters: StrategyParams):
-    """Update team's trading strategy"""
-    if not simulator:
-        raise HTTPException(status_code=503, detail="Simulator not initialized")
-
-    if team_id not in simulator.teams:
-        raise HTTPException(status_code=404, detail="Team not found")
-
-    team = simulator.teams[team_id]
-    team.strategy = strategy
-    team.parameters = parameters
-
-    return {"message": "Strategy updated", "team": team}
-
-
-@router.delete("/{team_id}")
-async def delete_team(team_id: str):
-    """Delete a team"""
-    if not simulator:
-        raise HTTPException(status_code=503, detail="Simulator not initialized")
-
-    if team_id not in simulator.teams:
-        raise HTTPException(status_code=404, detail="Team not found")
-
-    del simulator.teams[team_id]
-    return {"message": "Team deleted successfully"}
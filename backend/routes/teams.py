@@ -1,9 +1,82 @@
-from fastapi import APIRouter, HTTPException
-from models import Team, StrategyType, StrategyParams
+import json
+from typing import Any, List, Tuple, Type
+from fastapi import APIRouter, HTTPException, Request
+from pydantic import BaseModel, TypeAdapter, ValidationError
+from models import Team, StrategyType, StrategyParams, StrategyUpdate
 from simulation import simulator
 
 router = APIRouter()
 
+NDJSON_MEDIA_TYPES = {"application/x-ndjson", "application/ndjson", "application/jsonl"}
+BULK_BATCH_SIZE = 500
+
+
+async def _read_bulk_items(request: Request) -> Tuple[List[Tuple[int, Any]], List[dict]]:
+    """Parse a bulk request body as NDJSON or a JSON array.
+
+    Returns the decoded items with their position in the payload, plus
+    per-item errors for NDJSON lines that are not valid JSON.
+    """
+    body = await request.body()
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+
+    items = []
+    errors = []
+    if content_type in NDJSON_MEDIA_TYPES:
+        # Indices are physical line numbers so errors point at the payload as sent
+        for index, line in enumerate(body.splitlines()):
+            if not line.strip():
+                continue
+            try:
+                items.append((index, json.loads(line)))
+            except ValueError as exc:
+                errors.append({"index": index, "error": f"Invalid JSON: {exc}"})
+        return items, errors
+
+    try:
+        payload = json.loads(body or b"[]")
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=f"Invalid JSON: {exc}")
+    if not isinstance(payload, list):
+        raise HTTPException(status_code=400, detail="Expected a JSON array or NDJSON body")
+
+    return list(enumerate(payload)), errors
+
+
+def _validate_in_batches(items: List[Tuple[int, Any]], model: Type[BaseModel]) -> Tuple[List[Tuple[int, Any]], List[dict]]:
+    """Validate items against a model, one batch per call to pydantic.
+
+    A batch that fails as a whole is re-validated item by item so only the
+    offending entries are reported.
+    """
+    adapter = TypeAdapter(List[model])
+    valid = []
+    errors = []
+
+    for start in range(0, len(items), BULK_BATCH_SIZE):
+        batch = items[start:start + BULK_BATCH_SIZE]
+        try:
+            models = adapter.validate_python([raw for _, raw in batch])
+            valid.extend(zip((index for index, _ in batch), models))
+            continue
+        except ValidationError:
+            pass
+
+        for index, raw in batch:
+            try:
+                valid.append((index, model.model_validate(raw)))
+            except ValidationError as exc:
+                errors.append({"index": index, "error": exc.errors(include_url=False)})
+
+    return valid, errors
+
+
+def _bulk_response(message: str, applied: int, errors: List[dict], atomic: bool) -> dict:
+    errors.sort(key=lambda e: e["index"])
+    if atomic and errors:
+        raise HTTPException(status_code=400, detail={"message": "Bulk request rejected", "errors": errors})
+    return {"message": message, "applied": applied, "failed": len(errors), "errors": errors}
+
 
 @router.post("/create")
 async def create_team(team: Team):
@@ -14,10 +87,84 @@ async def create_team(team: Team):
     if team.id in simulator.teams:
         raise HTTPException(status_code=400, detail="Team ID already exists")
 
-    simulator.teams[team.id] = team
+    simulator.add_team(team)
     return {"message": "Team created successfully", "team": team}
 
 
+# Bulk endpoints accept a JSON array or NDJSON (one item per line). Valid
+# items are applied in a single synchronous block with no awaits, so the
+# simulator loop never observes a partially applied batch. With
+# ``atomic=true`` nothing is applied if any item fails.
+
+@router.post("/bulk/create")
+async def bulk_create_teams(request: Request, atomic: bool = False):
+    """Create many teams in one request"""
+    if not simulator:
+        raise HTTPException(status_code=503, detail="Simulator not initialized")
+
+    items, errors = await _read_bulk_items(request)
+    valid, validation_errors = _validate_in_batches(items, Team)
+    errors.extend(validation_errors)
+
+    new_teams = {}
+    for index, team in valid:
+        if team.id in simulator.teams or team.id in new_teams:
+            errors.append({"index": index, "id": team.id, "error": "Team ID already exists"})
+            continue
+        new_teams[team.id] = team
+
+    response = _bulk_response("Teams created", len(new_teams), errors, atomic)
+    for team in new_teams.values():
+        simulator.add_team(team)
+    return response
+
+
+@router.put("/bulk/strategy")
+async def bulk_update_strategies(request: Request, atomic: bool = False):
+    """Update the strategy of many teams in one request"""
+    if not simulator:
+        raise HTTPException(status_code=503, detail="Simulator not initialized")
+
+    items, errors = await _read_bulk_items(request)
+    valid, validation_errors = _validate_in_batches(items, StrategyUpdate)
+    errors.extend(validation_errors)
+
+    updates = []
+    for index, update in valid:
+        if update.team_id not in simulator.teams:
+            errors.append({"index": index, "id": update.team_id, "error": "Team not found"})
+            continue
+        updates.append(update)
+
+    response = _bulk_response("Strategies updated", len(updates), errors, atomic)
+    for update in updates:
+        simulator.set_strategy(simulator.teams[update.team_id], update.strategy, update.parameters)
+    return response
+
+
+@router.post("/bulk/delete")
+async def bulk_delete_teams(request: Request, atomic: bool = False):
+    """Delete many teams in one request; items are team IDs"""
+    if not simulator:
+        raise HTTPException(status_code=503, detail="Simulator not initialized")
+
+    items, errors = await _read_bulk_items(request)
+
+    team_ids = set()
+    for index, team_id in items:
+        if not isinstance(team_id, str):
+            errors.append({"index": index, "error": "Expected a team ID string"})
+        elif team_id not in simulator.teams:
+            errors.append({"index": index, "id": team_id, "error": "Team not found"})
+        else:
+            team_ids.add(team_id)
+
+    response = _bulk_response("Teams deleted", len(team_ids), errors, atomic)
+    for team_id in team_ids:
+        simulator.remove_team(team_id)
+    return response
+
+
 @router.get("/{team_id}")
 async def get_team(team_id: str):
     """Get team information"""
@@ -49,8 +196,7 @@ async def update_strategy(team_id: str, strategy: StrategyType, parameters: Stra
         raise HTTPException(status_code=404, detail="Team not found")
 
     team = simulator.teams[team_id]
-    team.strategy = strategy
-    team.parameters = parameters
+    simulator.set_strategy(team, strategy, parameters)
 
     return {"message": "Strategy updated", "team": team}
 
@@ -64,5 +210,5 @@ async def delete_team(team_id: str):
     if team_id not in simulator.teams:
         raise HTTPException(status_code=404, detail="Team not found")
 
-    del simulator.teams[team_id]
+    simulator.remove_team(team_id)
     return {"message": "Team deleted successfully"}
@@ -1,5 +1,5 @@
 from fastapi import APIRouter, HTTPException
-from models import TradeRequest, Position
+from models import TradeRequest
 from simulation import simulator
 
 router = APIRouter()
@@ -22,13 +22,7 @@ async def execute_trade(trade: TradeRequest):
         if team.balance < cost:
             raise HTTPException(status_code=400, detail="Insufficient balance")
 
-        team.positions.append(Position(
-            quantity=trade.quantity,
-            entry_price=current_price,
-            position_type="long"
-        ))
-        team.balance -= cost
-        team.trades_count += 1
+        simulator.open_position(team, trade.quantity)
 
         return {
             "message": "Buy order executed",
@@ -42,15 +36,8 @@ async def execute_trade(trade: TradeRequest):
         if not team.positions:
             raise HTTPException(status_code=400, detail="No positions to close")
 
-        total_proceeds = 0
-        positions_closed = 0
-
-        for pos in team.positions[:]:
-            proceeds = pos.quantity * current_price
-            team.balance += proceeds
-            total_proceeds += proceeds
-            team.positions.remove(pos)
-            positions_closed += 1
+        positions_closed = len(team.positions)
+        total_proceeds = simulator.close_positions(team)
 
         return {
             "message": "Positions closed",
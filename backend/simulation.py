@@ -1,9 +1,56 @@
 import asyncio
+import os
 import numpy as np
 import time
-from models import MarketState, MarketEvent, Team, Position
+from models import STARTING_BALANCE, MarketState, MarketEvent, Team, Position, StrategyType, StrategyParams
 from events import EventGenerator
-from typing import Dict
+from aggregates import MarketAggregates
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+def pnl_metrics(pnl_history: List[float]) -> Tuple[float, float]:
+    """Annualised Sharpe ratio and win rate (%) of a P&L series"""
+    sharpe_ratio = 0.0
+    win_rate = 0.0
+    if len(pnl_history) > 1:
+        returns = np.diff(pnl_history)
+        if np.std(returns) > 0:
+            sharpe_ratio = float(np.mean(returns) / np.std(returns) * np.sqrt(252))
+        win_rate = float(np.count_nonzero(returns > 0) / len(returns) * 100)
+    return sharpe_ratio, win_rate
+
+
+def leaderboard_payload(rows: Iterable[tuple], price: float, tick: int) -> dict:
+    """Rank teams by total value.
+
+    Each row is (team_id, team_name, balance, quantity held, trades_count,
+    strategy, sharpe_ratio, win_rate).
+    """
+    entries = []
+    for team_id, team_name, balance, quantity, trades_count, strategy, sharpe_ratio, win_rate in rows:
+        total_value = balance + quantity * price
+        entries.append({
+            "team_id": team_id,
+            "team_name": team_name,
+            "balance": balance,
+            "total_value": total_value,
+            "total_pnl": total_value - STARTING_BALANCE,
+            "sharpe_ratio": sharpe_ratio,
+            "trades_count": trades_count,
+            "win_rate": win_rate,
+            "strategy": strategy
+        })
+
+    entries.sort(key=lambda x: x["total_value"], reverse=True)
+
+    for i, entry in enumerate(entries):
+        entry["rank"] = i + 1
+
+    return {
+        "leaderboard": entries,
+        "total_teams": len(entries),
+        "current_tick": tick
+    }
 
 
 class MarketSimulator:
@@ -17,6 +64,12 @@ class MarketSimulator:
         )
         self.teams: Dict[str, Team] = {}
         self.event_generator = EventGenerator()
+        self.aggregates = MarketAggregates()
+        # Bumped whenever teams are added or removed
+        self.roster_version = 0
+        # Bumped by every change to teams or holdings, so cached responses
+        # keyed on it never outlive the state they were built from
+        self.version = 0
         self.price_history = [500.0]
         self.tick_interval = 2.0
 
@@ -29,9 +82,85 @@ class MarketSimulator:
         """Main simulation loop"""
         while True:
             await asyncio.sleep(self.tick_interval)
-            self.update_market()
-            self.process_strategies()
-            self.check_events()
+            self.step()
+
+    def step(self):
+        """Advance the market by one tick"""
+        self.update_market()
+        self.process_strategies()
+        self.aggregates.record_tick(self.market_state)
+        self.check_events()
+
+    def add_team(self, team: Team):
+        """Register a team and its holdings"""
+        self.teams[team.id] = team
+        self.aggregates.add_team(team)
+        self.roster_version += 1
+        self.version += 1
+
+    def remove_team(self, team_id: str):
+        team = self.teams.pop(team_id)
+        self.aggregates.remove_team(team)
+        self.roster_version += 1
+        self.version += 1
+
+    def set_strategy(self, team: Team, strategy: StrategyType, parameters: StrategyParams):
+        self.aggregates.remove_team(team)
+        team.strategy = strategy
+        team.parameters = parameters
+        self.aggregates.add_team(team)
+        self.version += 1
+
+    def open_position(self, team: Team, quantity: float):
+        """Buy a long position at the current price"""
+        cost = quantity * self.market_state.price
+        team.positions.append(Position(
+            quantity=quantity,
+            entry_price=self.market_state.price,
+            position_type="long"
+        ))
+        team.balance -= cost
+        team.trades_count += 1
+
+        self.aggregates.record_cash(team, -cost)
+        self.aggregates.record_position(team, 1, quantity)
+        self.aggregates.record_trade(team)
+        self.version += 1
+        return cost
+
+    def close_positions(self, team: Team, positions: Optional[List[Position]] = None):
+        """Sell the given positions (all by default) at the current price"""
+        if positions is None:
+            positions = team.positions
+
+        proceeds = 0.0
+        quantity = 0.0
+        for pos in positions:
+            proceeds += pos.quantity * self.market_state.price
+            quantity += pos.quantity
+
+        closing = set(map(id, positions))
+        team.positions = [pos for pos in team.positions if id(pos) not in closing]
+        team.balance += proceeds
+
+        self.aggregates.record_cash(team, proceeds)
+        self.aggregates.record_position(team, -len(positions), -quantity)
+        self.version += 1
+        return proceeds
+
+    @property
+    def cache_state(self) -> Tuple[int, int]:
+        """Changes whenever a cached response may be stale"""
+        return self.market_state.tick, self.version
+
+    def leaderboard(self) -> dict:
+        """Current leaderboard, ranked by total value"""
+        rows = [
+            (team.id, team.name, team.balance, sum(pos.quantity for pos in team.positions),
+             team.trades_count, team.strategy.value, *pnl_metrics(team.pnl_history))
+            for team in self.teams.values()
+        ]
+        return leaderboard_payload(rows, self.market_state.price, self.market_state.tick)
 
     def update_market(self):
         """Update market price using Ornstein-Uhlenbeck process"""
@@ -59,6 +188,7 @@ class MarketSimulator:
 
     def process_strategies(self):
         """Execute trades based on team strategies"""
+        totals = self.aggregates.empty_totals()
         for team in self.teams.values():
             if team.strategy.value == "momentum":
                 self.execute_momentum_strategy(team)
@@ -70,6 +200,10 @@ class MarketSimulator:
                 self.execute_hedger_strategy(team)
 
             self.update_team_pnl(team)
+            totals[team.strategy].add(team)
+
+        # Exact recount, replacing whatever the incremental updates drifted to
+        self.aggregates.by_strategy = totals
 
     def execute_momentum_strategy(self, team: Team):
         """Buy on upward momentum, sell on downward"""
@@ -84,18 +218,10 @@ class MarketSimulator:
         if price_change > threshold and len(team.positions) == 0:
             quantity = (team.balance * team.parameters.risk_level * 0.1) / self.market_state.price
             if quantity > 0 and team.balance > quantity * self.market_state.price:
-                team.positions.append(Position(
-                    quantity=quantity,
-                    entry_price=self.market_state.price,
-                    position_type="long"
-                ))
-                team.balance -= quantity * self.market_state.price
-                team.trades_count += 1
+                self.open_position(team, quantity)
 
         elif price_change < -threshold and len(team.positions) > 0:
-            for pos in team.positions:
-                team.balance += pos.quantity * self.market_state.price
-            team.positions.clear()
+            self.close_positions(team)
 
     def execute_mean_reversion_strategy(self, team: Team):
         """Buy when price is below mean, sell when above"""
@@ -110,18 +236,10 @@ class MarketSimulator:
         if deviation < -threshold and len(team.positions) == 0:
             quantity = (team.balance * team.parameters.risk_level * 0.1) / self.market_state.price
             if quantity > 0 and team.balance > quantity * self.market_state.price:
-                team.positions.append(Position(
-                    quantity=quantity,
-                    entry_price=self.market_state.price,
-                    position_type="long"
-                ))
-                team.balance -= quantity * self.market_state.price
-                team.trades_count += 1
+                self.open_position(team, quantity)
 
         elif deviation > threshold and len(team.positions) > 0:
-            for pos in team.positions:
-                team.balance += pos.quantity * self.market_state.price
-            team.positions.clear()
+            self.close_positions(team)
 
     def execute_news_strategy(self, team: Team):
         """Trade based on sentiment from events"""
@@ -133,57 +251,40 @@ class MarketSimulator:
         if sentiment_effect > 0.5 and len(team.positions) == 0:
             quantity = (team.balance * team.parameters.risk_level * 0.15) / self.market_state.price
             if quantity > 0 and team.balance > quantity * self.market_state.price:
-                team.positions.append(Position(
-                    quantity=quantity,
-                    entry_price=self.market_state.price,
-                    position_type="long"
-                ))
-                team.balance -= quantity * self.market_state.price
-                team.trades_count += 1
+                self.open_position(team, quantity)
 
         elif sentiment_effect < -0.5 and len(team.positions) > 0:
-            for pos in team.positions:
-                team.balance += pos.quantity * self.market_state.price
-            team.positions.clear()
+            self.close_positions(team)
 
     def execute_hedger_strategy(self, team: Team):
         """Conservative strategy with stop-loss"""
-        # 1. Start with an empty list for positions we want to KEEP
-        kept_positions = []
-        
+        # 1. Collect the positions that hit stop-loss or take-profit
+        closing_positions = []
+
         # 2. Iterate through current positions
         for pos in team.positions:
             pnl_pct = (self.market_state.price - pos.entry_price) / pos.entry_price * 100
 
             # Check if we should CLOSE the trade
             if pnl_pct < -team.parameters.stop_loss or pnl_pct > team.parameters.take_profit:
-                # Sell and add cash to balance immediately
-                team.balance += pos.quantity * self.market_state.price
-            else:
-                # Keep the position
-                kept_positions.append(pos)
-        
-        # 3. Update the team's positions list in one go
-        team.positions = kept_positions
+                closing_positions.append(pos)
+
+        # 3. Sell them in one go
+        if closing_positions:
+            self.close_positions(team, closing_positions)
 
         # 4. Open new positions if we have no active trades (existing logic)
         if len(team.positions) == 0:
             if np.random.random() < 0.05:
                 quantity = (team.balance * 0.05) / self.market_state.price
                 if quantity > 0 and team.balance > quantity * self.market_state.price:
-                    team.positions.append(Position(
-                        quantity=quantity,
-                        entry_price=self.market_state.price,
-                        position_type="long"
-                    ))
-                    team.balance -= quantity * self.market_state.price
-                    team.trades_count += 1
+                    self.open_position(team, quantity)
 
     def update_team_pnl(self, team: Team):
         """Calculate and record team P&L"""
         position_value = sum(pos.quantity * self.market_state.price for pos in team.positions)
         total_value = team.balance + position_value
-        pnl = total_value - 100000.0
+        pnl = total_value - STARTING_BALANCE
         team.pnl_history.append(pnl)
 
         if len(team.pnl_history) > 500:
@@ -201,5 +302,12 @@ class MarketSimulator:
             self.market_state.active_event = self.event_generator.generate_event()
 
 
-# Global simulator instance
-simulator = MarketSimulator()
+# Global simulator instance. In a multi-worker deployment the API workers
+# serve a read-only replica of the owner process's state (see cluster.py).
+SIMULATOR_ROLE = os.environ.get("SIMULATOR_ROLE", "standalone")
+
+if SIMULATOR_ROLE == "worker":
+    from cluster import SimulatorReplica
+    simulator = SimulatorReplica()
+else:
+    simulator = MarketSimulator()
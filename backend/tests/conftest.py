@@ -0,0 +1,23 @@
+import os
+import sys
+
+import pytest
+
+# Backend modules import each other as top-level modules (from models import ...)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def client():
+    """Test client for the app, with the global simulator emptied afterwards"""
+    from fastapi.testclient import TestClient
+
+    from encoding import response_cache
+    from main import app
+    from simulation import simulator
+
+    # No context manager: the lifespan would start the simulator's tick loop
+    yield TestClient(app)
+    for team_id in list(simulator.teams):
+        simulator.remove_team(team_id)
+    response_cache.clear()
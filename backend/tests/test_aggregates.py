@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+
+from models import STARTING_BALANCE, StrategyParams, StrategyType, Team
+from simulation import MarketSimulator, simulator as app_simulator
+
+FIELDS = ("teams", "balance", "positions", "open_interest", "trades")
+
+
+def recount(simulator):
+    totals = simulator.aggregates.empty_totals()
+    for team in simulator.teams.values():
+        totals[team.strategy].add(team)
+    return totals
+
+
+def assert_matches_recount(simulator, exact=False):
+    expected = recount(simulator)
+    for strategy, totals in simulator.aggregates.by_strategy.items():
+        for field in FIELDS:
+            want = getattr(expected[strategy], field)
+            got = getattr(totals, field)
+            assert got == (want if exact else pytest.approx(want)), (strategy, field)
+
+
+@pytest.fixture
+def simulator():
+    np.random.seed(7)
+    simulator = MarketSimulator()
+    strategies = list(StrategyType)
+    for i in range(20):
+        simulator.add_team(Team(id=f"t{i}", name=f"Team {i}", strategy=strategies[i % len(strategies)]))
+    for _ in range(40):
+        simulator.step()
+    return simulator
+
+
+def test_tick_rebuilds_totals_exactly(simulator):
+    assert_matches_recount(simulator, exact=True)
+
+
+def test_changes_between_ticks_match_recount(simulator):
+    teams = list(simulator.teams.values())
+    simulator.open_position(teams[0], 0.1)
+    simulator.open_position(teams[0], 0.2)
+    simulator.open_position(teams[1], 3.7)
+    assert_matches_recount(simulator)
+
+    simulator.close_positions(teams[0])
+    simulator.close_positions(teams[1], teams[1].positions[-1:])
+    assert_matches_recount(simulator)
+
+    simulator.set_strategy(teams[1], StrategyType.HEDGER, StrategyParams(stop_loss=20.0))
+    simulator.set_strategy(teams[2], StrategyType.NEWS_FOLLOWER, StrategyParams())
+    assert_matches_recount(simulator)
+
+    simulator.remove_team(teams[3].id)
+    simulator.add_team(Team(id="late", name="Late", balance=5000.0, trades_count=2))
+    assert_matches_recount(simulator)
+
+    simulator.step()
+    assert_matches_recount(simulator, exact=True)
+
+
+def test_emptied_totals_reset_to_zero(simulator):
+    for team in simulator.teams.values():
+        simulator.open_position(team, 0.1)
+        simulator.open_position(team, 0.2)
+    for team in simulator.teams.values():
+        simulator.close_positions(team)
+    for totals in simulator.aggregates.by_strategy.values():
+        assert (totals.positions, totals.open_interest) == (0, 0.0)
+
+    for team_id in list(simulator.teams):
+        simulator.remove_team(team_id)
+    for totals in simulator.aggregates.by_strategy.values():
+        assert [getattr(totals, field) for field in FIELDS] == [0, 0.0, 0, 0.0, 0]
+
+
+def test_stats_volume_is_zero_once_everything_is_closed(client):
+    for i, quantity in enumerate([0.1, 0.2, 0.7, 1.3]):
+        team_id = f"t{i}"
+        assert client.post("/api/teams/create", json={"id": team_id, "name": team_id}).status_code == 200
+        for _ in range(3):
+            trade = {"team_id": team_id, "action": "buy", "quantity": quantity}
+            assert client.post("/api/trade/execute", json=trade).status_code == 200
+    assert client.get("/api/leaderboard/stats").json()["total_volume"] == pytest.approx(6.9)
+
+    for i in range(4):
+        assert client.post("/api/trade/execute", json={"team_id": f"t{i}", "action": "close"}).status_code == 200
+    stats = client.get("/api/leaderboard/stats").json()
+    assert stats["total_volume"] == 0.0
+    assert all(strategy["open_interest"] == 0.0 for strategy in stats["strategies"].values())
+    assert stats["average_pnl"] == pytest.approx(
+        sum(team.balance for team in app_simulator.teams.values()) / 4 - STARTING_BALANCE
+    )
@@ -0,0 +1,285 @@
+import asyncio
+import json
+import os
+import uuid
+
+import pytest
+from fastapi import FastAPI, Request
+
+from cluster import (
+    SEQUENCE, CommandClient, PublishError, SharedStateReader, SharedStateWriter, SimulatorReplica,
+    StatePublisher, call_asgi, command_handler, worker_middleware
+)
+from models import StrategyType, Team
+from simulation import MarketSimulator
+
+
+@pytest.fixture
+def shm_name():
+    name = f"bbb_test_{uuid.uuid4().hex[:8]}"
+    writers = []
+    yield name, writers
+    for writer in writers:
+        writer.close()
+
+
+@pytest.fixture
+def socket_path(tmp_path):
+    runtime = tmp_path / "run"
+    runtime.mkdir(mode=0o700)
+    os.chmod(runtime, 0o700)
+    return str(runtime / "simulator.sock")
+
+
+class ReadyPublisher:
+    """Publisher double whose publishes complete (or fail) immediately"""
+
+    def __init__(self, error=None):
+        self.error = error
+
+    def request(self):
+        future = asyncio.get_running_loop().create_future()
+        if self.error:
+            future.set_exception(self.error)
+        else:
+            future.set_result(None)
+        return future
+
+
+def make_simulator(teams=40, ticks=30):
+    simulator = MarketSimulator()
+    strategies = list(StrategyType)
+    for i in range(teams):
+        simulator.add_team(Team(id=f"t{i}", name=f"Team {i}", strategy=strategies[i % len(strategies)]))
+    for _ in range(ticks):
+        simulator.step()
+    return simulator
+
+
+def make_publisher(simulator, shm_name):
+    name, writers = shm_name
+    state_writer = SharedStateWriter(name, 4 * 1024 * 1024)
+    history_writer = SharedStateWriter(f"{name}_history", 4 * 1024 * 1024)
+    writers += [state_writer, history_writer]
+    return StatePublisher(simulator, state_writer, history_writer)
+
+
+def test_shared_state_round_trip(shm_name):
+    name, writers = shm_name
+    writer = SharedStateWriter(name, 4096)
+    writers.append(writer)
+    reader = SharedStateReader(name)
+
+    writer.publish([b"market", b"teams"])
+    sequence, sections = reader.read()
+    assert sequence == 2
+    assert sections[:2] == [b"market", b"teams"]
+
+    writer.publish([b"next", b""])
+    sequence, sections = reader.read()
+    assert sequence == 4
+    assert sections[:2] == [b"next", b""]
+    reader.close()
+
+
+def test_reader_times_out_during_write(shm_name):
+    name, writers = shm_name
+    writer = SharedStateWriter(name, 4096)
+    writers.append(writer)
+    writer.publish([b"market"])
+    reader = SharedStateReader(name)
+
+    # An odd sequence means the owner is mid-write
+    writer.shm.buf[0] = 3
+    with pytest.raises(TimeoutError):
+        reader.read(timeout=0.05)
+    reader.close()
+
+
+def test_oversized_snapshot_raises_publish_error(shm_name):
+    name, writers = shm_name
+    writer = SharedStateWriter(name, 128)
+    writers.append(writer)
+    with pytest.raises(PublishError):
+        writer.publish([b"x" * 1024])
+
+
+def test_replica_matches_simulator(shm_name):
+    simulator = make_simulator()
+    publisher = make_publisher(simulator, shm_name)
+    replica = SimulatorReplica(shm_name[0])
+
+    for _ in range(2):
+        publisher.publish_now()
+        assert replica.refresh()
+
+        assert replica.market_state == simulator.market_state
+        assert replica.cache_state == simulator.cache_state
+        assert replica.price_history == simulator.price_history
+        assert replica.aggregates.summary(replica.market_state) == simulator.aggregates.summary(simulator.market_state)
+        assert list(replica.aggregates.history) == list(simulator.aggregates.history)
+        assert {k: t.model_dump() for k, t in replica.teams.items()} == \
+               {k: t.model_dump() for k, t in simulator.teams.items()}
+
+        expected = simulator.leaderboard()
+        leaderboard = replica.leaderboard()
+        assert [e["team_id"] for e in leaderboard["leaderboard"]] == [e["team_id"] for e in expected["leaderboard"]]
+        for got, want in zip(leaderboard["leaderboard"], expected["leaderboard"]):
+            assert got["sharpe_ratio"] == pytest.approx(want["sharpe_ratio"])
+            assert got["win_rate"] == pytest.approx(want["win_rate"])
+
+        # The next publish only carries each team's newest pnl value
+        simulator.step()
+
+    assert not replica.refresh()
+
+
+def start_write(writer):
+    """Leave a segment looking like the owner is halfway through a publish"""
+    SEQUENCE.pack_into(writer.shm.buf, 0, writer.sequence + 1)
+
+
+def test_replica_keeps_previous_state_during_write(shm_name):
+    simulator = make_simulator(teams=4, ticks=3)
+    publisher = make_publisher(simulator, shm_name)
+    publisher.publish_now()
+    replica = SimulatorReplica(shm_name[0])
+    assert replica.refresh()
+    tick = replica.market_state.tick
+
+    simulator.step()
+    publisher.publish_now()
+    start_write(publisher.state_writer)
+    assert not replica.refresh()
+    assert replica.market_state.tick == tick
+
+
+@pytest.mark.parametrize("clean_shutdown", [True, False])
+def test_replica_reattaches_after_owner_restart(shm_name, clean_shutdown):
+    name, writers = shm_name
+    make_publisher(make_simulator(teams=4, ticks=3), shm_name).publish_now()
+    replica = SimulatorReplica(name)
+    assert replica.refresh()
+    assert len(replica.teams) == 4
+
+    old_writers = writers[:]
+    writers.clear()
+    if clean_shutdown:
+        for writer in old_writers:
+            writer.close()
+
+    # A new owner replaces the segments under the same names
+    restarted = make_simulator(teams=2, ticks=5)
+    make_publisher(restarted, shm_name).publish_now()
+    if not clean_shutdown:
+        for writer in old_writers:
+            writer.shm.close()
+
+    assert replica.refresh()
+    assert replica.market_state == restarted.market_state
+    assert sorted(replica.teams) == sorted(restarted.teams)
+    assert list(replica.aggregates.history) == list(restarted.aggregates.history)
+
+
+def worker_app(replica, client):
+    app = FastAPI()
+    app.middleware("http")(worker_middleware(replica, client))
+
+    @app.get("/tick")
+    async def tick():
+        return {"tick": replica.market_state.tick}
+
+    @app.get("/teams")
+    async def teams():
+        return {"teams": len(replica.teams)}
+
+    return app
+
+
+def owner_app():
+    app = FastAPI()
+
+    @app.post("/echo")
+    async def echo(request: Request):
+        return {"body": (await request.body()).decode(), "query": request.url.query}
+
+    return app
+
+
+def run_with_owner(socket_path, publisher, scenario):
+    async def main():
+        server = await asyncio.start_unix_server(command_handler(owner_app(), publisher), path=socket_path)
+        try:
+            return await scenario()
+        finally:
+            server.close()
+            await server.wait_closed()
+
+    return asyncio.run(main())
+
+
+def test_worker_middleware_reads_replica_and_forwards_writes(shm_name, socket_path):
+    simulator = make_simulator(teams=4, ticks=3)
+    make_publisher(simulator, shm_name).publish_now()
+    app = worker_app(SimulatorReplica(shm_name[0]), CommandClient(socket_path))
+
+    async def scenario():
+        status, _, body = await call_asgi(app, "GET", "/tick")
+        assert (status, json.loads(body)) == (200, {"tick": simulator.market_state.tick})
+
+        for _ in range(2):  # the second request reuses the pooled connection
+            status, _, body = await call_asgi(app, "POST", "/echo", b"a=1", [(b"content-type", b"text/plain")], b"hi")
+            assert (status, json.loads(body)) == (200, {"body": "hi", "query": "a=1"})
+
+    run_with_owner(socket_path, ReadyPublisher(), scenario)
+
+
+def test_worker_middleware_reports_unreadable_history(shm_name, socket_path):
+    simulator = make_simulator(teams=4, ticks=3)
+    publisher = make_publisher(simulator, shm_name)
+    publisher.publish_now()
+    start_write(publisher.history_writer)
+    app = worker_app(SimulatorReplica(shm_name[0]), CommandClient(socket_path))
+
+    async def scenario():
+        assert (await call_asgi(app, "GET", "/tick"))[0] == 200
+        assert (await call_asgi(app, "GET", "/teams"))[0] == 503
+
+    asyncio.run(scenario())
+
+
+def test_worker_middleware_reports_publish_failure(shm_name, socket_path):
+    app = worker_app(SimulatorReplica(shm_name[0]), CommandClient(socket_path))
+
+    async def scenario():
+        status, _, body = await call_asgi(app, "POST", "/echo", body=b"hi")
+        assert status == 503
+        assert "too large" in json.loads(body)["detail"]
+
+    run_with_owner(socket_path, ReadyPublisher(PublishError("too large")), scenario)
+
+
+def test_worker_middleware_without_owner(shm_name, socket_path):
+    app = worker_app(SimulatorReplica(shm_name[0]), CommandClient(socket_path))
+
+    async def scenario():
+        assert (await call_asgi(app, "GET", "/tick"))[0] == 503
+        assert (await call_asgi(app, "POST", "/echo", body=b"hi"))[0] == 503
+
+    asyncio.run(scenario())
+
+
+def test_worker_middleware_times_out_forwarding(shm_name, socket_path):
+    app = worker_app(SimulatorReplica(shm_name[0]), CommandClient(socket_path, timeout=0.1))
+
+    async def scenario():
+        async def never_reply(reader, writer):
+            await reader.read()
+
+        server = await asyncio.start_unix_server(never_reply, path=socket_path)
+        try:
+            assert (await call_asgi(app, "POST", "/echo", body=b"hi"))[0] == 504
+        finally:
+            server.close()
+
+    asyncio.run(scenario())
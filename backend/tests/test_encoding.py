@@ -0,0 +1,42 @@
+import msgpack
+
+from models import Team
+from simulation import simulator
+
+
+def leaderboard(client, **headers):
+    response = client.get("/api/leaderboard/", headers=headers)
+    assert response.status_code == 200
+    return response
+
+
+def test_negotiates_msgpack(client):
+    simulator.add_team(Team(id="a", name="A"))
+    body = leaderboard(client, accept="application/msgpack")
+    assert body.headers["content-type"] == "application/msgpack"
+    assert msgpack.unpackb(body.content) == leaderboard(client).json()
+
+
+def test_cached_body_reused_within_a_tick(client):
+    simulator.add_team(Team(id="a", name="A"))
+    first = leaderboard(client).json()
+    # Not a mutation through the simulator, so the cached body stays
+    simulator.teams["a"].name = "Renamed"
+    assert leaderboard(client).json() == first
+
+
+def test_mutations_invalidate_cached_bodies_within_a_tick(client):
+    simulator.add_team(Team(id="a", name="A"))
+    assert leaderboard(client).json()["total_teams"] == 1
+
+    response = client.post("/api/teams/create", json={"id": "b", "name": "B"})
+    assert response.status_code == 200
+    assert leaderboard(client).json()["total_teams"] == 2
+
+    response = client.post("/api/trade/execute", json={"team_id": "a", "action": "buy", "quantity": 10})
+    assert response.status_code == 200
+    entry = next(e for e in leaderboard(client).json()["leaderboard"] if e["team_id"] == "a")
+    assert entry["trades_count"] == 1
+
+    client.delete("/api/teams/b")
+    assert leaderboard(client).json()["total_teams"] == 1
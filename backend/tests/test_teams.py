@@ -0,0 +1,82 @@
+import json
+
+from simulation import simulator
+
+NDJSON = {"content-type": "application/x-ndjson"}
+
+
+def ndjson(*lines):
+    return "\n".join(lines).encode()
+
+
+def test_bulk_create_from_json_array(client):
+    response = client.post("/api/teams/bulk/create", json=[{"id": "a", "name": "A"}, {"id": "b", "name": "B"}])
+    assert response.status_code == 200
+    assert response.json() == {"message": "Teams created", "applied": 2, "failed": 0, "errors": []}
+    assert sorted(simulator.teams) == ["a", "b"]
+
+
+def test_bulk_create_from_ndjson(client):
+    body = ndjson(json.dumps({"id": "a", "name": "A"}), json.dumps({"id": "b", "name": "B"}))
+    response = client.post("/api/teams/bulk/create", content=body, headers=NDJSON)
+    assert response.json()["applied"] == 2
+    assert sorted(simulator.teams) == ["a", "b"]
+
+
+def test_ndjson_errors_use_physical_line_numbers(client):
+    body = ndjson(
+        json.dumps({"id": "a", "name": "A"}),
+        "",
+        "{not json",
+        "   ",
+        json.dumps({"id": "b"}),
+        json.dumps({"id": "c", "name": "C"}),
+    )
+    response = client.post("/api/teams/bulk/create", content=body, headers=NDJSON)
+    result = response.json()
+    assert result["applied"] == 2
+    assert [error["index"] for error in result["errors"]] == [2, 4]
+    assert result["errors"][0]["error"].startswith("Invalid JSON")
+    assert sorted(simulator.teams) == ["a", "c"]
+
+
+def test_json_array_body_must_be_a_list(client):
+    response = client.post("/api/teams/bulk/create", json={"id": "a", "name": "A"})
+    assert response.status_code == 400
+    assert client.post("/api/teams/bulk/create", content=b"[{", headers={"content-type": "application/json"}).status_code == 400
+
+
+def test_bulk_create_reports_duplicates(client):
+    client.post("/api/teams/create", json={"id": "a", "name": "A"})
+    items = [{"id": "a", "name": "Again"}, {"id": "b", "name": "B"}, {"id": "b", "name": "B twice"}]
+    result = client.post("/api/teams/bulk/create", json=items).json()
+    assert result["applied"] == 1
+    assert [(error["index"], error["id"]) for error in result["errors"]] == [(0, "a"), (2, "b")]
+    assert simulator.teams["a"].name == "A"
+    assert simulator.teams["b"].name == "B"
+
+
+def test_atomic_bulk_create_rejects_whole_batch(client):
+    items = [{"id": "a", "name": "A"}, {"id": "b", "strategy": "unknown"}]
+    response = client.post("/api/teams/bulk/create?atomic=true", json=items)
+    assert response.status_code == 400
+    assert [error["index"] for error in response.json()["detail"]["errors"]] == [1]
+    assert simulator.teams == {}
+
+
+def test_bulk_strategy_and_delete(client):
+    client.post("/api/teams/bulk/create", json=[{"id": "a", "name": "A"}, {"id": "b", "name": "B"}])
+
+    updates = [{"team_id": "a", "strategy": "hedger"}, {"team_id": "missing", "strategy": "hedger"}]
+    result = client.put("/api/teams/bulk/strategy", json=updates).json()
+    assert (result["applied"], result["errors"][0]["index"]) == (1, 1)
+    assert simulator.teams["a"].strategy.value == "hedger"
+
+    response = client.post("/api/teams/bulk/delete?atomic=true", json=["a", "missing"])
+    assert response.status_code == 400
+    assert sorted(simulator.teams) == ["a", "b"]
+
+    result = client.post("/api/teams/bulk/delete", json=["a", 7, "missing"]).json()
+    assert result["applied"] == 1
+    assert [error["index"] for error in result["errors"]] == [1, 2]
+    assert sorted(simulator.teams) == ["b"]